@@ -28,7 +28,7 @@ from .serializers import (
 from .exceptions import raise_not_found, raise_permission_error, raise_validation_error
 from ..models import (
     User, Conversation, Message, MessageThread, MessageAttachment,
-    Notification
+    Notification, active_attachments_prefetch
 )
 
 logger = logging.getLogger(__name__)
@@ -414,7 +414,7 @@ class MessageViewSet(BaseAPIViewSet):
     serializer_class = MessageSerializer
     queryset = Message.objects.select_related(
         'conversation', 'sender', 'recipient', 'thread'
-    ).prefetch_related('attachments')
+    ).prefetch_related(active_attachments_prefetch())
     
     action_permissions = {
         'list': [CustomIsAuthenticated, IsParticipant],
@@ -449,7 +449,7 @@ class MessageViewSet(BaseAPIViewSet):
             Q(conversation__participants=user) & Q(is_deleted=False)
         ).select_related(
             'conversation', 'sender', 'recipient', 'thread'
-        ).prefetch_related('attachments').order_by('-created_at')
+        ).prefetch_related(active_attachments_prefetch()).order_by('-created_at')
     
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
@@ -628,9 +628,18 @@ class NotificationViewSet(BaseAPIViewSet):
     def get_queryset(self):
         """Filter notifications to only show those for the current user."""
         user = self.request.user
-        return Notification.objects.filter(
+        queryset = Notification.objects.filter(
             user=user
         ).select_related('sender', 'category').order_by('-created_at')
+        if self.action == 'list':
+            # Only the columns NotificationListSerializer reads
+            queryset = queryset.only(
+                'id', 'title', 'message', 'priority', 'status', 'is_read', 'is_clicked',
+                'action_url', 'created_at',
+                'category__id', 'category__name', 'category__color',
+                'sender__id', 'sender__username', 'sender__first_name', 'sender__last_name'
+            )
+        return queryset
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -669,14 +678,7 @@ class NotificationViewSet(BaseAPIViewSet):
         """Mark all notifications as read for the current user."""
         user = request.user
         
-        unread_notifications = self.get_queryset().filter(is_read=False)
-        count = unread_notifications.count()
-        
-        unread_notifications.update(
-            is_read=True,
-            read_at=timezone.now(),
-            status='delivered'
-        )
+        count = Notification.objects.mark_all_as_read(user)
         
         return Response({
             'status': 'all_marked_read',
@@ -702,9 +704,6 @@ class NotificationViewSet(BaseAPIViewSet):
     def unread_count(self, request):
         """Get count of unread notifications."""
         user = request.user
-        count = Notification.objects.filter(
-            user=user,
-            is_read=False
-        ).count()
+        count = Notification.objects.unread_count(user)
         
         return Response({'unread_count': count})
\ No newline at end of file
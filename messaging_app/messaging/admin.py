@@ -1,14 +1,33 @@
 from django.contrib import admin
+from django.forms.models import BaseInlineFormSet
+from django.db.models import Count
+from django.utils import timezone
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from messaging_app.paginator import EstimatedCountPaginator
 from .models import Conversation, Message, MessageThread, MessageAttachment
 
 
+class LatestMessagesFormSet(BaseInlineFormSet):
+    """Inline formset that only loads the newest ``max_num`` messages."""
+    
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            self._queryset = super().get_queryset().select_related('sender').order_by(
+                '-created_at'
+            )[:self.max_num]
+        return self._queryset
+
+
 class MessageInline(admin.TabularInline):
     """Inline admin for messages in conversations."""
     model = Message
+    formset = LatestMessagesFormSet
     extra = 0
+    max_num = 50
+    can_delete = False
+    show_change_link = True
     readonly_fields = ('sender', 'message_type', 'created_at', 'is_read', 'is_delivered')
     fields = ('sender', 'content', 'message_type', 'is_read', 'is_delivered', 'created_at')
 
@@ -28,6 +47,8 @@ class ConversationAdmin(admin.ModelAdmin):
         'name', 'conversation_type', 'participant_count', 'last_message_preview', 
         'status', 'is_active', 'created_at'
     )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_filter = (
         'conversation_type', 'status', 'is_active', 'is_private', 
         'created_at', 'updated_at'
@@ -55,11 +76,13 @@ class ConversationAdmin(admin.ModelAdmin):
     )
     
     filter_horizontal = ('participants',)
+    autocomplete_fields = ('created_by', 'last_message')
     
     def participant_count(self, obj):
         """Display participant count."""
-        return obj.participants.count()
+        return obj._participant_count
     participant_count.short_description = 'Participants'
+    participant_count.admin_order_field = '_participant_count'
     
     def last_message_preview(self, obj):
         """Display preview of last message."""
@@ -72,25 +95,23 @@ class ConversationAdmin(admin.ModelAdmin):
     last_message_preview.short_description = 'Last Message'
     
     def get_queryset(self, request):
-        """Optimize queryset with select_related."""
+        """Optimize queryset with select_related and an annotated participant count."""
         qs = super().get_queryset(request)
-        return qs.select_related('last_message', 'created_by').prefetch_related('participants')
+        return qs.select_related('last_message', 'created_by').annotate(
+            _participant_count=Count('participants', distinct=True)
+        )
     
     actions = ['archive_conversations', 'close_conversations', 'activate_conversations']
     
     def archive_conversations(self, request, queryset):
         """Action to archive selected conversations."""
-        updated = queryset.count()
-        for conversation in queryset:
-            conversation.archive_conversation()
+        updated = queryset.update(is_active=False, status='archived')
         self.message_user(request, f'{updated} conversations were archived.')
     archive_conversations.short_description = "Archive selected conversations"
     
     def close_conversations(self, request, queryset):
         """Action to close selected conversations."""
-        updated = queryset.count()
-        for conversation in queryset:
-            conversation.close_conversation()
+        updated = queryset.update(is_active=False, status='closed')
         self.message_user(request, f'{updated} conversations were closed.')
     close_conversations.short_description = "Close selected conversations"
     
@@ -109,11 +130,14 @@ class MessageAdmin(admin.ModelAdmin):
         'sender', 'conversation_name', 'content_preview', 'message_type', 
         'is_read', 'is_delivered', 'is_important', 'created_at'
     )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_filter = (
         'message_type', 'is_read', 'is_delivered', 'is_edited', 'is_important', 
         'is_urgent', 'created_at', 'conversation__conversation_type'
     )
     search_fields = ('content', 'sender__email', 'sender__username')
+    autocomplete_fields = ('conversation', 'thread', 'sender', 'recipient', 'deleted_by')
     readonly_fields = (
         'id', 'created_at', 'updated_at', 'is_edited', 'edited_at', 
         'is_read', 'read_at', 'is_delivered', 'delivered_at'
@@ -155,11 +179,7 @@ class MessageAdmin(admin.ModelAdmin):
     
     def mark_as_read(self, request, queryset):
         """Action to mark messages as read."""
-        updated = 0
-        for message in queryset:
-            if not message.is_read:
-                message.mark_as_read()
-                updated += 1
+        updated = queryset.filter(is_read=False).update(is_read=True, read_at=timezone.now())
         self.message_user(request, f'{updated} messages were marked as read.')
     mark_as_read.short_description = "Mark selected messages as read"
     
@@ -183,10 +203,18 @@ class MessageThreadAdmin(admin.ModelAdmin):
     list_display = ('subject', 'conversation', 'message_count', 'created_at')
     list_filter = ('created_at', 'conversation__conversation_type')
     search_fields = ('subject', 'conversation__name')
-    readonly_fields = ('id', 'created_at', 'updated_at')
+    readonly_fields = ('id', 'created_at', 'updated_at', 'all_messages_link')
     
     inlines = [MessageInline]
     
+    def all_messages_link(self, obj):
+        """Link to the full message changelist for this thread."""
+        if not obj.pk:
+            return '-'
+        url = reverse('admin:messaging_message_changelist')
+        return format_html('<a href="{}?thread__id__exact={}">View all messages</a>', url, obj.pk)
+    all_messages_link.short_description = 'All Messages'
+    
     def message_count(self, obj):
         """Display message count in thread."""
         return obj.messages.count()
@@ -198,8 +226,11 @@ class MessageAttachmentAdmin(admin.ModelAdmin):
     """Admin interface for MessageAttachment model."""
     
     list_display = ('filename', 'message_preview', 'file_type', 'human_readable_size', 'created_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_filter = ('file_type', 'created_at')
     search_fields = ('filename', 'message__content')
+    autocomplete_fields = ('message',)
     readonly_fields = ('id', 'file_size', 'human_readable_size', 'created_at')
     
     fieldsets = (
@@ -0,0 +1,103 @@
+"""
+Coalesced writes for conversation activity tracking.
+
+Every new message used to issue its own UPDATE against the conversations
+table. Instead, the latest message per conversation is recorded in a Redis
+hash and flushed to the database in batches by a periodic Celery task.
+Flushed entries are only removed once the database write has committed, so
+a failed flush leaves them for the next one. Entries whose message has been
+deleted in the meantime are dropped rather than written.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Q
+from django_redis import get_redis_connection
+
+
+PENDING_LAST_MESSAGES_KEY = 'messaging:last_message:pending'
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Only overwrite the pending entry when the incoming message is newer, so
+# out-of-order enqueues within a window still keep max(created_at).
+_ENQUEUE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if current then
+    local ts = tonumber(string.match(current, '^(%d+)'))
+    if ts >= tonumber(ARGV[2]) then
+        return 0
+    end
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2] .. ':' .. ARGV[3])
+return 1
+"""
+
+# Remove flushed entries, keeping any that a newer message replaced meanwhile.
+_ACK_SCRIPT = """
+for i = 1, #ARGV, 2 do
+    if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+return 0
+"""
+
+
+def _to_micros(value):
+    """Convert an aware datetime to integer microseconds since the epoch."""
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def enqueue_last_message(conversation_id, message_id, created_at):
+    """Record a conversation's newest message for the next batch flush."""
+    conn = get_redis_connection('default')
+    conn.eval(
+        _ENQUEUE_SCRIPT, 1, PENDING_LAST_MESSAGES_KEY,
+        str(conversation_id), _to_micros(created_at), str(message_id)
+    )
+
+
+def flush_last_messages():
+    """
+    Apply all pending last-message updates to the database.
+
+    The referenced messages are locked for the duration of the write, so
+    none can be deleted between the existence check and the commit.
+
+    Returns the number of conversations updated.
+    """
+    from .models import Conversation, Message
+
+    conn = get_redis_connection('default')
+    pending = conn.hgetall(PENDING_LAST_MESSAGES_KEY)
+    if not pending:
+        return 0
+
+    entries = []
+    for conversation_id, value in pending.items():
+        micros, message_id = value.decode().split(':', 1)
+        entries.append((conversation_id.decode(), micros, message_id))
+
+    updated = 0
+    with transaction.atomic():
+        existing = {
+            str(pk) for pk in Message.objects.select_for_update().filter(
+                pk__in=[message_id for _, _, message_id in entries]
+            ).values_list('pk', flat=True)
+        }
+        for conversation_id, micros, message_id in entries:
+            if message_id not in existing:
+                continue
+            last_message_at = _EPOCH + timedelta(microseconds=int(micros))
+            updated += Conversation.objects.filter(
+                Q(last_message_at__isnull=True) | Q(last_message_at__lt=last_message_at),
+                pk=conversation_id,
+            ).update(last_message_id=message_id, last_message_at=last_message_at)
+        flushed = [item for entry in pending.items() for item in entry]
+        transaction.on_commit(
+            lambda: conn.eval(_ACK_SCRIPT, 1, PENDING_LAST_MESSAGES_KEY, *flushed)
+        )
+    return updated
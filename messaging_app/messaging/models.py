@@ -1,10 +1,13 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.validators import FileExtensionValidator
 import uuid
 import os
 
+from .batch import enqueue_last_message
+
 
 User = get_user_model()
 
@@ -19,6 +22,17 @@ def conversation_image_upload_path(instance, filename):
     return f'conversations/images/{instance.id}/{filename}'
 
 
+def format_file_size(size):
+    """Return a human readable representation of a size in bytes."""
+    size = size or 0
+    if size < 1024:
+        return f"{size} B"
+    # Each unit is 2**10 larger, so the bit length picks the unit directly
+    exponent = min((size.bit_length() - 1) // 10, 4)
+    unit = ('B', 'KB', 'MB', 'GB', 'TB')[exponent]
+    return f"{size / (1 << (exponent * 10)):.1f} {unit}"
+
+
 class MessageThread(models.Model):
     """
     Represents a thread of messages within a conversation.
@@ -154,7 +168,14 @@ class Message(models.Model):
         return self.expires_at and timezone.now() > self.expires_at
     
     def get_attachments(self):
-        """Get all attachments for this message."""
+        """
+        Get all attachments for this message.
+
+        Uses ``active_attachments`` when the queryset was built with
+        ``active_attachments_prefetch()``.
+        """
+        if hasattr(self, 'active_attachments'):
+            return self.active_attachments
         return self.attachments.filter(is_deleted=False)
     
     def get_thread_depth(self):
@@ -196,6 +217,7 @@ class MessageAttachment(models.Model):
     filename = models.CharField(max_length=255)
     file_type = models.CharField(max_length=20, choices=FILE_TYPE_CHOICES)
     file_size = models.PositiveBigIntegerField()  # Size in bytes
+    human_readable_size = models.CharField(max_length=16, blank=True, editable=False)
     mime_type = models.CharField(max_length=100)
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
@@ -214,21 +236,35 @@ class MessageAttachment(models.Model):
         return f"Attachment: {self.filename}"
     
     def save(self, *args, **kwargs):
-        """Override save to set file information."""
+        """
+        Override save to set file information.
+
+        Reading the size can be a network call on remote storage backends, so
+        uploads without a known size, and files replaced on an existing row,
+        are stored with a zero size and completed by the
+        ``messaging.tasks.finalize_attachment`` task after commit.
+        """
+        finalize = False
         if self.file:
             self.filename = os.path.basename(self.file.name)
-            self.file_size = self.file.size
+            replaced = not self._state.adding and not self.file._committed
+            if self.file_size is None or replaced:
+                self.file_size = 0
+                finalize = True
+        self.human_readable_size = format_file_size(self.file_size)
         super().save(*args, **kwargs)
-    
-    @property
-    def human_readable_size(self):
-        """Return human readable file size."""
-        size = self.file_size
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size < 1024:
-                return f"{size:.1f} {unit}"
-            size /= 1024
-        return f"{size:.1f} TB"
+        if finalize:
+            from .tasks import finalize_attachment
+            transaction.on_commit(lambda: finalize_attachment.delay(self.pk))
+
+
+def active_attachments_prefetch():
+    """Prefetch a message's non-deleted attachments into ``active_attachments``."""
+    return models.Prefetch(
+        'attachments',
+        queryset=MessageAttachment.objects.filter(is_deleted=False),
+        to_attr='active_attachments'
+    )
 
 
 class ConversationManager(models.Manager):
@@ -242,9 +278,11 @@ class ConversationManager(models.Manager):
         """Get or create a direct conversation between two users."""
         conversation = self.filter(
             conversation_type='direct',
-            participants=user1
+            participants__in=[user1, user2]
+        ).annotate(
+            matched_participants=Count('participants', distinct=True)
         ).filter(
-            participants=user2
+            matched_participants=2
         ).first()
         
         if conversation:
@@ -308,6 +346,10 @@ class Conversation(models.Model):
         db_table = 'conversations'
         indexes = [
             models.Index(fields=['conversation_type']),
+            models.Index(
+                fields=['id'], name='conversation_direct_idx',
+                condition=models.Q(conversation_type='direct')
+            ),
             models.Index(fields=['is_active']),
             models.Index(fields=['status']),
             models.Index(fields=['last_message_at']),
@@ -326,9 +368,24 @@ class Conversation(models.Model):
     
     def add_participant(self, user):
         """Add a user to the conversation."""
-        if self.participants.count() >= self.max_participants:
-            raise ValueError("Maximum participants reached")
-        self.participants.add(user)
+        self.add_participants([user])
+    
+    def add_participants(self, users):
+        """
+        Add several users to the conversation at once.
+
+        The conversation row is locked while checking the limit so concurrent
+        invites cannot push it past ``max_participants``.
+        """
+        through = Conversation.participants.through
+        with transaction.atomic():
+            locked = Conversation.objects.select_for_update().only('max_participants').get(pk=self.pk)
+            if locked.participants.count() + len(users) > locked.max_participants:
+                raise ValueError("Maximum participants reached")
+            through.objects.bulk_create(
+                [through(conversation_id=self.pk, user_id=user.pk) for user in users],
+                ignore_conflicts=True
+            )
     
     def remove_participant(self, user):
         """Remove a user from the conversation."""
@@ -348,10 +405,20 @@ class Conversation(models.Model):
         ).exclude(sender=user).count()
     
     def update_last_message(self, message):
-        """Update last message information."""
+        """
+        Update last message information.
+
+        The database write is coalesced with other messages and applied by
+        the ``messaging.tasks.flush_last_messages`` periodic task. It is only
+        queued once the current transaction commits, so a message that is
+        rolled back never reaches the queue.
+        """
         self.last_message = message
         self.last_message_at = message.created_at
-        self.save(update_fields=['last_message', 'last_message_at'])
+        conversation_id, message_id, created_at = self.pk, message.pk, message.created_at
+        transaction.on_commit(
+            lambda: enqueue_last_message(conversation_id, message_id, created_at)
+        )
     
     def archive_conversation(self):
         """Archive the conversation."""
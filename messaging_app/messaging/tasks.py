@@ -0,0 +1,37 @@
+"""
+Background tasks for the messaging app.
+"""
+
+import mimetypes
+
+from celery import shared_task
+
+from . import batch
+from .models import MessageAttachment, format_file_size
+
+
+@shared_task(ignore_result=True)
+def flush_last_messages():
+    """Flush coalesced last-message updates to the conversations table."""
+    return batch.flush_last_messages()
+
+
+@shared_task(ignore_result=True)
+def finalize_attachment(attachment_id):
+    """Fill in size and content type for a newly uploaded attachment."""
+    try:
+        attachment = MessageAttachment.objects.only('id', 'file', 'mime_type').get(pk=attachment_id)
+    except MessageAttachment.DoesNotExist:
+        return
+    
+    file_size = attachment.file.size
+    mime_type = (
+        attachment.mime_type
+        or mimetypes.guess_type(attachment.file.name)[0]
+        or 'application/octet-stream'
+    )
+    MessageAttachment.objects.filter(pk=attachment_id).update(
+        file_size=file_size,
+        human_readable_size=format_file_size(file_size),
+        mime_type=mime_type
+    )
@@ -0,0 +1,194 @@
+"""
+Test suite for the messaging app.
+
+Tests cover the coalesced last-message writes in messaging.batch (queued
+updates reaching the database, surviving a failed flush, and entries that
+must not block the queue) and attachment size bookkeeping.
+"""
+
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django_redis import get_redis_connection
+from . import batch, tasks
+from .models import Conversation, Message, MessageAttachment
+
+
+User = get_user_model()
+
+
+class LastMessageBatchTest(TestCase):
+    """Test cases for the enqueue -> flush round trip."""
+
+    def setUp(self):
+        """Set up test data and empty the last-message queue."""
+        self.conn = get_redis_connection('default')
+        self.conn.delete(batch.PENDING_LAST_MESSAGES_KEY)
+        self.addCleanup(self.conn.delete, batch.PENDING_LAST_MESSAGES_KEY)
+
+        self.user = User.objects.create_user(
+            username='sender',
+            email='sender@example.com',
+            password='testpassword123'
+        )
+        self.conversation = Conversation.objects.create(name='Team', created_by=self.user)
+        self.message = Message.objects.create(
+            conversation=self.conversation, sender=self.user, content='Hello'
+        )
+
+    def enqueue(self, message, conversation=None):
+        """Record ``message`` as its conversation's newest, as after a commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            (conversation or self.conversation).update_last_message(message)
+
+    def flush(self):
+        """Flush pending updates, running the post-commit cleanup."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return batch.flush_last_messages()
+
+    def pending(self):
+        return self.conn.hgetall(batch.PENDING_LAST_MESSAGES_KEY)
+
+    def test_enqueue_waits_for_commit(self):
+        """Test that nothing is queued until the transaction commits."""
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.conversation.update_last_message(self.message)
+        self.assertEqual(self.pending(), {})
+
+        callbacks[0]()
+        self.assertEqual(len(self.pending()), 1)
+
+    def test_flush_applies_last_message(self):
+        """Test that a queued last message is written on flush."""
+        self.enqueue(self.message)
+
+        self.assertEqual(self.flush(), 1)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.last_message_id, self.message.pk)
+        self.assertEqual(self.conversation.last_message_at, self.message.created_at)
+        self.assertEqual(self.pending(), {})
+
+    def test_failed_flush_keeps_entries(self):
+        """Test that entries survive a flush whose database write fails."""
+        self.enqueue(self.message)
+
+        with mock.patch.object(Conversation.objects, 'filter', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.flush()
+        self.assertEqual(len(self.pending()), 1)
+
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.pending(), {})
+
+    def test_deleted_message_is_dropped(self):
+        """Test that an entry for a deleted message does not block the queue."""
+        other = Conversation.objects.create(name='Other', created_by=self.user)
+        other_message = Message.objects.create(
+            conversation=other, sender=self.user, content='Still here'
+        )
+        self.enqueue(self.message)
+        self.enqueue(other_message, other)
+        self.message.delete()
+
+        self.assertEqual(self.flush(), 1)
+        self.conversation.refresh_from_db()
+        other.refresh_from_db()
+        self.assertIsNone(self.conversation.last_message_id)
+        self.assertEqual(other.last_message_id, other_message.pk)
+        self.assertEqual(self.pending(), {})
+
+    def test_newer_entry_survives_flush(self):
+        """Test that a message queued during a flush is kept for the next one."""
+        self.enqueue(self.message)
+        newer = Message.objects.create(
+            conversation=self.conversation, sender=self.user, content='Newer'
+        )
+        Message.objects.filter(pk=newer.pk).update(
+            created_at=self.message.created_at + timedelta(seconds=1)
+        )
+        newer.refresh_from_db()
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            batch.flush_last_messages()
+        self.enqueue(newer)
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(len(self.pending()), 1)
+        self.flush()
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.last_message_id, newer.pk)
+
+
+class MessageAttachmentTest(TestCase):
+    """Test cases for attachment size bookkeeping."""
+
+    def setUp(self):
+        """Set up a message and a throwaway MEDIA_ROOT for uploads."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        finalize_patch = mock.patch.object(tasks.finalize_attachment, 'delay')
+        self.finalize = finalize_patch.start()
+        self.addCleanup(finalize_patch.stop)
+
+        user = User.objects.create_user(
+            username='uploader',
+            email='uploader@example.com',
+            password='testpassword123'
+        )
+        conversation = Conversation.objects.create(name='Files', created_by=user)
+        self.message = Message.objects.create(
+            conversation=conversation, sender=user, content='See attached'
+        )
+
+    def create_attachment(self, content, **kwargs):
+        """Create an attachment for ``content``, running on-commit hooks."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return MessageAttachment.objects.create(
+                message=self.message,
+                file=ContentFile(content, name='notes.txt'),
+                file_type='document',
+                mime_type='text/plain',
+                **kwargs
+            )
+
+    def test_known_size_is_formatted_on_save(self):
+        """Test that a caller-supplied size is formatted without a finalize task."""
+        attachment = self.create_attachment(b'x' * 3000, file_size=3000)
+
+        attachment.refresh_from_db()
+        self.assertEqual(attachment.human_readable_size, '2.9 KB')
+        self.finalize.assert_not_called()
+
+    def test_unknown_size_is_finalized(self):
+        """Test that an upload without a size is completed by the finalize task."""
+        attachment = self.create_attachment(b'x' * 10)
+        self.finalize.assert_called_once_with(attachment.pk)
+
+        tasks.finalize_attachment(attachment.pk)
+        attachment.refresh_from_db()
+        self.assertEqual(attachment.file_size, 10)
+        self.assertEqual(attachment.human_readable_size, '10 B')
+
+    def test_replaced_file_is_finalized_again(self):
+        """Test that replacing the file drops the old size and refinalizes."""
+        attachment = self.create_attachment(b'x' * 3000, file_size=3000)
+
+        attachment.file = ContentFile(b'y' * 10, name='short.txt')
+        with self.captureOnCommitCallbacks(execute=True):
+            attachment.save()
+        self.assertEqual(attachment.file_size, 0)
+        self.finalize.assert_called_once_with(attachment.pk)
+
+        tasks.finalize_attachment(attachment.pk)
+        attachment.refresh_from_db()
+        self.assertEqual(attachment.human_readable_size, '10 B')
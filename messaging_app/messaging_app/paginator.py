@@ -0,0 +1,36 @@
+"""
+Paginators for large admin changelists.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reads the row estimate from PostgreSQL statistics.
+
+    The admin changelist counts the whole table on every page load. When
+    the queryset is unfiltered, the planner's estimate in ``pg_class`` is
+    close enough for pagination and avoids a full ``COUNT(*)``. Filtered
+    querysets and other database backends get an exact count.
+    """
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where:
+            connection = connections[queryset.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                        [queryset.model._meta.db_table]
+                    )
+                    row = cursor.fetchone()
+                # reltuples is -1 until the table has been analyzed
+                if row and row[0] >= 0:
+                    return row[0]
+        return super().count
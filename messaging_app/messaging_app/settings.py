@@ -126,7 +126,7 @@ DATABASES = {
 # Caching Configuration
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'BACKEND': 'django_redis.cache.RedisCache',
         'LOCATION': get_env_variable('REDIS_URL', 'redis://localhost:6379/1'),
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
@@ -411,6 +411,22 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'notifications.tasks.send_daily_notifications',
         'schedule': 86400.0,  # Every day
     },
+    'flush-conversation-last-messages': {
+        'task': 'messaging.tasks.flush_last_messages',
+        'schedule': 0.2,  # Every 200ms
+    },
+    'flush-notification-status-updates': {
+        'task': 'notifications.tasks.flush_status_updates',
+        'schedule': 1.0,  # Every second
+    },
+    'requeue-due-webhooks': {
+        'task': 'notifications.tasks.requeue_due_webhooks',
+        'schedule': 60.0,  # Every minute
+    },
+    'dispatch-pending-webhooks': {
+        'task': 'notifications.tasks.dispatch_pending_webhooks',
+        'schedule': 5.0,  # Every 5 seconds
+    },
 }
 
 # Custom middleware for request timing
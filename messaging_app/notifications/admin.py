@@ -1,22 +1,44 @@
+from django import forms
 from django.contrib import admin
-from django.utils.html import format_html
+from django.db.models import F, Prefetch, prefetch_related_objects
+from django.db.models.functions import Length, Substr
+from django.utils import timezone
 from django.urls import reverse
-from django.utils.safestring import mark_safe
+from messaging_app.paginator import EstimatedCountPaginator
 from .models import (
     NotificationChannel, NotificationCategory, Notification, 
     NotificationPreference, EmailNotification, PushNotification, 
-    WebhookNotification
+    WebhookNotification, clear_unread_count_cache
 )
+from .batch import chunked
+from .signals import notifications_bulk_marked_read
 
 
-@admin.register(NotificationChannel)
-class NotificationChannelAdmin(admin.ModelAdmin):
+# Rows per UPDATE when an action is split into chunks to keep lock windows short
+UPDATE_CHUNK_SIZE = 5000
+
+def _is_changelist(request):
+    """Return True when the request is for an admin changelist page."""
+    match = request.resolver_match
+    return match is not None and (match.url_name or '').endswith('_changelist')
+
+
+# Shared by every admin whose model has created_at/updated_at
+_TIMESTAMP_FIELDSET = ('Metadata', {'fields': ('created_at', 'updated_at')})
+
+
+class _TimestampAdmin(admin.ModelAdmin):
+    """Base admin for models with created_at/updated_at timestamps."""
+    
+    readonly_fields = ('created_at', 'updated_at')
+
+
+class NotificationChannelAdmin(_TimestampAdmin):
     """Admin interface for NotificationChannel model."""
     
     list_display = ('name', 'channel_type', 'is_active', 'created_at')
     list_filter = ('channel_type', 'is_active', 'created_at')
     search_fields = ('name',)
-    readonly_fields = ('created_at', 'updated_at')
     
     fieldsets = (
         (None, {
@@ -25,13 +47,10 @@ class NotificationChannelAdmin(admin.ModelAdmin):
         ('Configuration', {
             'fields': ('config',)
         }),
-        ('Metadata', {
-            'fields': ('created_at', 'updated_at')
-        }),
+        _TIMESTAMP_FIELDSET,
     )
 
 
-@admin.register(NotificationCategory)
 class NotificationCategoryAdmin(admin.ModelAdmin):
     """Admin interface for NotificationCategory model."""
     
@@ -74,7 +93,6 @@ class WebhookNotificationInline(admin.TabularInline):
     readonly_fields = ('url', 'method', 'status', 'status_code', 'sent_at')
 
 
-@admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     """Admin interface for Notification model."""
     
@@ -82,6 +100,13 @@ class NotificationAdmin(admin.ModelAdmin):
         'title', 'user_email', 'category', 'priority', 'status', 
         'is_read', 'is_archived', 'scheduled_at', 'created_at'
     )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Hot filter combinations and the Notification.Meta.indexes serving them:
+    #   is_read=No per user            -> notif_unread_by_user (partial)
+    #   all per user, newest first     -> notif_list_by_user
+    #   status + scheduled_at range    -> (status, scheduled_at)
+    #   is_archived=No [+ status]      -> notif_unarchived_idx (partial)
     list_filter = (
         'priority', 'status', 'category', 'is_read', 'is_archived', 
         'is_clicked', 'is_dismissed', 'created_at', 'scheduled_at'
@@ -121,59 +146,84 @@ class NotificationAdmin(admin.ModelAdmin):
     )
     
     filter_horizontal = ('channels',)
+    list_select_related = ('category',)
     
     def user_email(self, obj):
         """Display user email."""
-        return obj.user.email
+        return obj.user_email
     user_email.short_description = 'User'
     
     def get_queryset(self, request):
-        """Optimize queryset with select_related."""
+        """Optimize queryset with select_related; load only listed columns on the changelist."""
         qs = super().get_queryset(request)
+        if _is_changelist(request):
+            return qs.select_related('category').only(
+                'id', 'user', 'title', 'priority', 'status', 'is_read', 'is_archived',
+                'scheduled_at', 'created_at', 'user_email', 'category__name'
+            )
         return qs.select_related('user', 'sender', 'category')
     
+    def get_object(self, request, object_id, from_field=None):
+        """Prefetch the selected channels for the change form without their config."""
+        obj = super().get_object(request, object_id, from_field)
+        if obj is not None:
+            prefetch_related_objects([obj], Prefetch(
+                'channels', queryset=NotificationChannel.objects.only('id', 'name', 'channel_type')
+            ))
+        return obj
+    
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        """Load only the columns the channel picker displays."""
+        if db_field.name == 'channels':
+            kwargs['queryset'] = NotificationChannel.objects.only('id', 'name', 'channel_type')
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+    
     actions = ['mark_as_read', 'mark_as_unread', 'archive_notifications', 'delete_notifications']
     
     def mark_as_read(self, request, queryset):
         """Action to mark notifications as read."""
-        updated = 0
-        for notification in queryset:
-            notification.mark_as_read()
-            updated += 1
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        updated = queryset.filter(is_read=False).update(
+            is_read=True, read_at=timezone.now(), status='read'
+        )
+        clear_unread_count_cache(*user_ids)
+        notifications_bulk_marked_read.send(sender=Notification, queryset=queryset, request=request)
         self.message_user(request, f'{updated} notifications were marked as read.')
     mark_as_read.short_description = "Mark selected notifications as read"
     
     def mark_as_unread(self, request, queryset):
         """Action to mark notifications as unread."""
-        updated = queryset.update(is_read=False, read_at=None, status='pending')
+        rows = list(queryset.values_list('pk', 'user_id'))
+        updated = 0
+        for chunk in chunked((pk for pk, _ in rows), UPDATE_CHUNK_SIZE):
+            updated += Notification.objects.filter(pk__in=chunk).update(
+                is_read=False, read_at=None, status='pending'
+            )
+        clear_unread_count_cache(*{user_id for _, user_id in rows})
         self.message_user(request, f'{updated} notifications were marked as unread.')
     mark_as_unread.short_description = "Mark selected notifications as unread"
     
     def archive_notifications(self, request, queryset):
         """Action to archive notifications."""
-        updated = 0
-        for notification in queryset:
-            notification.archive()
-            updated += 1
+        updated = queryset.filter(is_archived=False).update(is_archived=True, status='archived')
         self.message_user(request, f'{updated} notifications were archived.')
     archive_notifications.short_description = "Archive selected notifications"
     
     def delete_notifications(self, request, queryset):
         """Action to delete notifications."""
-        count = queryset.count()
-        queryset.delete()
+        _, deleted = queryset.delete()
+        count = deleted.get(Notification._meta.label, 0)
         self.message_user(request, f'{count} notifications were deleted.')
     delete_notifications.short_description = "Delete selected notifications"
 
 
-@admin.register(NotificationPreference)
-class NotificationPreferenceAdmin(admin.ModelAdmin):
+class NotificationPreferenceAdmin(_TimestampAdmin):
     """Admin interface for NotificationPreference model."""
     
     list_display = ('user_email', 'category', 'frequency', 'is_enabled', 'quiet_hours_enabled')
     list_filter = ('frequency', 'is_enabled', 'quiet_hours_enabled', 'email_enabled', 'push_enabled', 'sms_enabled')
     search_fields = ('user__email', 'user__username', 'category__name')
-    readonly_fields = ('created_at', 'updated_at')
+    list_select_related = ('user', 'category')
     
     fieldsets = (
         (None, {
@@ -191,9 +241,7 @@ class NotificationPreferenceAdmin(admin.ModelAdmin):
         ('Settings', {
             'fields': ('is_enabled', 'do_not_disturb_until')
         }),
-        ('Metadata', {
-            'fields': ('created_at', 'updated_at')
-        }),
+        _TIMESTAMP_FIELDSET,
     )
     
     def user_email(self, obj):
@@ -202,20 +250,37 @@ class NotificationPreferenceAdmin(admin.ModelAdmin):
     user_email.short_description = 'User'
 
 
-@admin.register(EmailNotification)
-class EmailNotificationAdmin(admin.ModelAdmin):
+class EmailNotificationAdminForm(forms.ModelForm):
+    """Edits the compressed HTML body as plain text."""
+    
+    html_content = forms.CharField(widget=forms.Textarea)
+    
+    class Meta:
+        model = EmailNotification
+        exclude = ('html_content_zstd',)
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial.setdefault('html_content', self.instance.html_content)
+    
+    def save(self, commit=True):
+        self.instance.html_content = self.cleaned_data['html_content']
+        return super().save(commit)
+
+
+class EmailNotificationAdmin(_TimestampAdmin):
     """Admin interface for EmailNotification model."""
     
+    form = EmailNotificationAdminForm
     list_display = (
         'subject', 'to_email', 'status', 'opened', 'clicked', 
         'bounced', 'retry_count', 'created_at'
     )
     list_filter = ('status', 'bounce_type', 'retry_count', 'created_at')
     search_fields = ('subject', 'to_email', 'message_id')
-    readonly_fields = (
-        'created_at', 'updated_at', 'opened_at', 'clicked_at', 
-        'bounced_at'
-    )
+    autocomplete_fields = ('notification',)
+    readonly_fields = _TimestampAdmin.readonly_fields + ('opened_at', 'clicked_at', 'bounced_at')
     
     fieldsets = (
         (None, {
@@ -233,44 +298,43 @@ class EmailNotificationAdmin(admin.ModelAdmin):
         ('Retry & Error', {
             'fields': ('retry_count', 'error_message')
         }),
-        ('Metadata', {
-            'fields': ('created_at', 'updated_at')
-        }),
+        _TIMESTAMP_FIELDSET,
     )
     
     def opened(self, obj):
         """Show if email was opened."""
-        if obj.opened_at:
-            return format_html('<span style="color: green;">✓</span>')
-        return format_html('<span style="color: red;">✗</span>')
+        return bool(obj.opened_at)
     opened.boolean = True
     opened.short_description = 'Opened'
     
     def clicked(self, obj):
         """Show if email was clicked."""
-        if obj.clicked_at:
-            return format_html('<span style="color: green;">✓</span>')
-        return format_html('<span style="color: red;">✗</span>')
+        return bool(obj.clicked_at)
     clicked.boolean = True
     clicked.short_description = 'Clicked'
     
     def bounced(self, obj):
         """Show if email bounced."""
-        if obj.bounced_at:
-            return format_html('<span style="color: red;">Bounced</span>')
-        return format_html('<span style="color: green;">OK</span>')
+        return bool(obj.bounced_at)
     bounced.boolean = True
     bounced.short_description = 'Bounced'
+    
+    def get_queryset(self, request):
+        """Skip the email bodies on the changelist."""
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            return qs.defer('html_content_zstd', 'text_content')
+        return qs
 
 
-@admin.register(PushNotification)
-class PushNotificationAdmin(admin.ModelAdmin):
+class PushNotificationAdmin(_TimestampAdmin):
     """Admin interface for PushNotification model."""
     
     list_display = ('title', 'platform', 'device_token_preview', 'status', 'clicked', 'created_at')
     list_filter = ('platform', 'status', 'created_at')
     search_fields = ('title', 'body', 'device_token')
-    readonly_fields = ('created_at', 'updated_at', 'sent_at', 'clicked_at', 'failed_at')
+    autocomplete_fields = ('notification',)
+    readonly_fields = _TimestampAdmin.readonly_fields + ('sent_at', 'clicked_at', 'failed_at')
     
     fieldsets = (
         (None, {
@@ -291,38 +355,43 @@ class PushNotificationAdmin(admin.ModelAdmin):
         ('Error Information', {
             'fields': ('error_message',)
         }),
-        ('Metadata', {
-            'fields': ('created_at', 'updated_at')
-        }),
+        _TIMESTAMP_FIELDSET,
     )
     
     def device_token_preview(self, obj):
         """Display preview of device token."""
-        if obj.device_token:
-            return obj.device_token[:20] + '...'
+        if obj.device_token_short:
+            return obj.device_token_short + '...'
         return 'No token'
     device_token_preview.short_description = 'Device Token'
     
+    def get_queryset(self, request):
+        """Fetch only the device token prefix shown on the changelist."""
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            return qs.annotate(
+                device_token_short=Substr('device_token', 1, 20)
+            ).defer('device_token')
+        return qs
+    
     def clicked(self, obj):
         """Show if push notification was clicked."""
-        if obj.clicked_at:
-            return format_html('<span style="color: green;">✓</span>')
-        return format_html('<span style="color: red;">✗</span>')
+        return bool(obj.clicked_at)
     clicked.boolean = True
     clicked.short_description = 'Clicked'
 
 
-@admin.register(WebhookNotification)
-class WebhookNotificationAdmin(admin.ModelAdmin):
+class WebhookNotificationAdmin(_TimestampAdmin):
     """Admin interface for WebhookNotification model."""
     
     list_display = (
         'method', 'url_preview', 'status', 'status_code', 'retry_count', 'created_at'
     )
     list_filter = ('method', 'status', 'retry_count', 'created_at')
-    search_fields = ('url', 'payload', 'response_body')
-    readonly_fields = (
-        'created_at', 'updated_at', 'sent_at', 'delivered_at', 'failed_at'
+    search_fields = ('url',)
+    autocomplete_fields = ('notification',)
+    readonly_fields = _TimestampAdmin.readonly_fields + (
+        'response_body', 'sent_at', 'delivered_at', 'failed_at'
     )
     
     fieldsets = (
@@ -341,26 +410,47 @@ class WebhookNotificationAdmin(admin.ModelAdmin):
         ('Retry Configuration', {
             'fields': ('retry_count', 'max_retries', 'next_retry_at')
         }),
-        ('Metadata', {
-            'fields': ('created_at', 'updated_at')
-        }),
+        _TIMESTAMP_FIELDSET,
     )
     
     def url_preview(self, obj):
         """Display preview of URL."""
-        return obj.url[:50] + '...' if len(obj.url) > 50 else obj.url
+        return obj.url_short + '...' if obj.url_length > 50 else obj.url_short
     url_preview.short_description = 'URL'
     
+    def get_queryset(self, request):
+        """Skip request and response bodies and the full URL on the changelist."""
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            return qs.annotate(
+                url_short=Substr('url', 1, 50), url_length=Length('url')
+            ).defer(
+                'url', 'headers', 'payload', 'payload_json',
+                'response_body_zstd', 'response_headers'
+            )
+        return qs
+    
     actions = ['retry_failed_webhooks']
     
     def retry_failed_webhooks(self, request, queryset):
         """Action to retry failed webhooks."""
-        updated = 0
-        for webhook in queryset:
-            if webhook.can_retry():
-                webhook.status = 'pending'
-                webhook.next_retry_at = None
-                webhook.save(update_fields=['status', 'next_retry_at'])
-                updated += 1
+        # Same predicate as WebhookNotification.can_retry()
+        updated = queryset.filter(
+            status__in=['failed', 'retried'], retry_count__lt=F('max_retries')
+        ).update(status='pending', next_retry_at=None)
         self.message_user(request, f'{updated} webhooks were queued for retry.')
-    retry_failed_webhooks.short_description = "Retry failed webhooks"
\ No newline at end of file
+    retry_failed_webhooks.short_description = "Retry failed webhooks"
+
+
+REGISTRY = (
+    (NotificationChannel, NotificationChannelAdmin),
+    (NotificationCategory, NotificationCategoryAdmin),
+    (Notification, NotificationAdmin),
+    (NotificationPreference, NotificationPreferenceAdmin),
+    (EmailNotification, EmailNotificationAdmin),
+    (PushNotification, PushNotificationAdmin),
+    (WebhookNotification, WebhookNotificationAdmin),
+)
+
+for model, admin_cls in REGISTRY:
+    admin.site.register(model, admin_cls)
@@ -0,0 +1,91 @@
+"""
+Concurrent webhook delivery over pooled connections.
+
+Webhooks used to be posted one at a time, each request blocking a worker
+and paying for its own TCP/TLS handshake. A batch is now sent concurrently
+through a single ``httpx.AsyncClient``, whose connection pool keeps
+connections to the same host alive across requests in the batch.
+"""
+
+import asyncio
+
+import httpx
+
+from .models import WebhookNotification
+
+
+MAX_CONNECTIONS = 200
+MAX_KEEPALIVE_CONNECTIONS = 100
+MAX_CONCURRENT_REQUESTS = 100
+REQUEST_TIMEOUT = 10.0
+
+# Every field mark_as_delivered() or mark_as_failed() may change
+OUTCOME_FIELDS = [
+    'status', 'status_code', 'response_body_zstd', 'response_headers',
+    'delivered_at', 'failed_at', 'retry_count', 'next_retry_at',
+]
+
+
+async def _post(client, semaphore, webhook, body):
+    """Send one webhook and return the response, or the exception raised."""
+    headers = {'Content-Type': 'application/json', **webhook.headers}
+    async with semaphore:
+        try:
+            return await client.request(
+                webhook.method, webhook.url, content=body, headers=headers
+            )
+        # Not just httpx.HTTPError: a bad URL or header raises other types,
+        # and one escaping gather() would strand the whole claimed batch.
+        except Exception as exc:
+            return exc
+
+
+async def send_webhooks(webhooks, bodies):
+    """
+    Send ``webhooks`` with the matching ``bodies`` concurrently and return
+    their outcomes in order.
+
+    Each outcome is either an ``httpx.Response`` or the exception that
+    prevented one from being received.
+    """
+    limits = httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+    )
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with httpx.AsyncClient(limits=limits, timeout=REQUEST_TIMEOUT) as client:
+        return await asyncio.gather(*(
+            _post(client, semaphore, wh, body) for wh, body in zip(webhooks, bodies)
+        ))
+
+
+def deliver_webhooks(webhooks):
+    """
+    Send ``webhooks`` and record each outcome on its row.
+
+    Outcomes are set through the model's ``mark_as_*`` methods and written
+    with one bulk_update straight away rather than through the status flush,
+    so a claimed webhook never sits in sent with its outcome still queued.
+    Returns the number of webhooks delivered successfully.
+    """
+    if not webhooks:
+        return 0
+
+    # Encoded up front: a missing pre-encoded body loads the payload, which
+    # cannot happen inside the event loop
+    bodies = [webhook.get_payload_json() for webhook in webhooks]
+    outcomes = asyncio.run(send_webhooks(webhooks, bodies))
+
+    delivered = 0
+    for webhook, outcome in zip(webhooks, outcomes):
+        if isinstance(outcome, Exception):
+            webhook.mark_as_failed(response_body=str(outcome), queue=False)
+        elif outcome.is_success:
+            webhook.mark_as_delivered(
+                outcome.status_code, outcome.text, dict(outcome.headers), queue=False
+            )
+            delivered += 1
+        else:
+            webhook.mark_as_failed(outcome.status_code, outcome.text, queue=False)
+    WebhookNotification.objects.bulk_update(webhooks, OUTCOME_FIELDS)
+    return delivered
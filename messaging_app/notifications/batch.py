@@ -0,0 +1,131 @@
+"""
+Coalesced status writes for notification deliveries.
+
+Delivery status transitions (sent, delivered, opened, failed, ...) used to
+issue one single-row UPDATE each. Instead, the changed field values are
+pushed onto a Redis list and applied with ``bulk_update`` in batches by a
+periodic Celery task.
+
+A flush moves the pending list to a processing key and only deletes it once
+the database transaction commits, so a failed flush is retried by the next
+one instead of dropping its updates. Queued status values never move a row
+backwards: each model's STATUS_CHOICES are declared in lifecycle order, and
+a queued status is skipped for rows that have already reached a later one
+(e.g. a delivery receipt flushed after the user has read the notification).
+"""
+
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.apps import apps
+from django.db import transaction
+from django_redis import get_redis_connection
+
+
+PENDING_STATUS_UPDATES_KEY = 'notifications:status_updates:pending'
+PROCESSING_STATUS_UPDATES_KEY = 'notifications:status_updates:processing'
+
+BULK_UPDATE_BATCH_SIZE = 500
+
+# Claim the pending list unless an earlier, uncommitted claim is still there,
+# in which case that one is returned again to be retried.
+_CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 and redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+end
+return redis.call('LRANGE', KEYS[2], 0, -1)
+"""
+
+
+def chunked(iterable, size):
+    """Yield successive lists of at most ``size`` items from ``iterable``."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def enqueue(instance, field_names):
+    """Queue the current values of ``field_names`` on ``instance`` for the next flush."""
+    values = {}
+    for name in field_names:
+        field = instance._meta.get_field(name)
+        if field.value_from_object(instance) is None:
+            values[name] = None
+        else:
+            values[name] = field.value_to_string(instance)
+
+    conn = get_redis_connection('default')
+    conn.rpush(PENDING_STATUS_UPDATES_KEY, json.dumps({
+        'model': instance._meta.label,
+        'pk': str(instance.pk),
+        'fields': values,
+    }))
+
+
+def _drop_stale_statuses(model, rows):
+    """
+    Remove queued statuses that would move a row back in its lifecycle.
+
+    Statuses outside the field's choices have no known place in the
+    lifecycle and are never guarded.
+    """
+    rank = {value: i for i, (value, _) in enumerate(model._meta.get_field('status').choices)}
+    pks = [pk for pk, values in rows if 'status' in values]
+    if not pks:
+        return
+    current = dict(
+        model.objects.select_for_update().filter(pk__in=pks).values_list('pk', 'status')
+    )
+    for pk, values in rows:
+        if 'status' not in values:
+            continue
+        current_rank = rank.get(current.get(pk))
+        queued_rank = rank.get(values['status'])
+        if current_rank is not None and queued_rank is not None and current_rank > queued_rank:
+            del values['status']
+
+
+def flush_status_updates():
+    """
+    Apply all pending status updates to the database.
+
+    Updates for the same row are merged, later values winning, and rows are
+    grouped by model and changed field set so each group is one bulk_update.
+    Returns the number of rows updated.
+    """
+    conn = get_redis_connection('default')
+    pending = conn.eval(
+        _CLAIM_SCRIPT, 2, PENDING_STATUS_UPDATES_KEY, PROCESSING_STATUS_UPDATES_KEY
+    )
+
+    merged = {}
+    for raw in pending:
+        entry = json.loads(raw)
+        merged.setdefault(entry['model'], {}).setdefault(entry['pk'], {}).update(entry['fields'])
+
+    updated = 0
+    with transaction.atomic():
+        for label, by_pk in merged.items():
+            model = apps.get_model(label)
+            rows = [(model._meta.pk.to_python(pk), values) for pk, values in by_pk.items()]
+            _drop_stale_statuses(model, rows)
+
+            groups = defaultdict(list)
+            for pk, values in rows:
+                if values:
+                    groups[tuple(sorted(values))].append((pk, values))
+
+            for field_names, group in groups.items():
+                objs = []
+                for pk, values in group:
+                    obj = model(pk=pk)
+                    for name, value in values.items():
+                        field = model._meta.get_field(name)
+                        setattr(obj, field.attname, None if value is None else field.to_python(value))
+                    objs.append(obj)
+                updated += model.objects.bulk_update(
+                    objs, field_names, batch_size=BULK_UPDATE_BATCH_SIZE
+                )
+        transaction.on_commit(lambda: conn.delete(PROCESSING_STATUS_UPDATES_KEY))
+    return updated
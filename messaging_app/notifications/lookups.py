@@ -0,0 +1,80 @@
+"""
+Cached lookups for notification reference data.
+
+Channels and categories are small, rarely-changing tables that are resolved
+on every send. Lookups are served from an in-process LRU cache, then the
+shared cache, then the database. Each tier is keyed by a version number held
+in the shared cache; saving or deleting a channel or category bumps the
+version, which retires stale entries in every process. Each process re-reads
+the version at most every LOOKUP_VERSION_LOCAL_TTL seconds, so a warm lookup
+makes no network call and other processes see a change within that window.
+
+Returned instances are shared between callers and must be treated as
+read-only.
+"""
+
+import time
+from functools import lru_cache
+
+from django.core.cache import cache
+
+
+LOOKUP_VERSION_KEY = 'notif:lookups:version'
+LOOKUP_CACHE_TTL = 3600  # seconds
+LOOKUP_VERSION_LOCAL_TTL = 5  # seconds
+
+# (version, monotonic deadline) as last read from the shared cache
+_local_version = (None, 0.0)
+
+
+def _version():
+    global _local_version
+    version, deadline = _local_version
+    now = time.monotonic()
+    if now >= deadline:
+        version = cache.get_or_set(LOOKUP_VERSION_KEY, 1, None)
+        _local_version = (version, now + LOOKUP_VERSION_LOCAL_TTL)
+    return version
+
+
+def bump_lookup_version():
+    """Invalidate all cached channel and category lookups."""
+    global _local_version
+    try:
+        cache.incr(LOOKUP_VERSION_KEY)
+    except ValueError:
+        cache.set(LOOKUP_VERSION_KEY, 1, None)
+    # Re-read on the next lookup so this process sees its own change at once
+    _local_version = (None, 0.0)
+
+
+def _lookup(model, kind, name, version):
+    key = f'notif:{kind}:{name}:v{version}'
+    instance = cache.get(key)
+    if instance is None:
+        instance = model.objects.filter(name=name).first()
+        if instance is not None:
+            cache.set(key, instance, LOOKUP_CACHE_TTL)
+    return instance
+
+
+@lru_cache(maxsize=128)
+def _get_channel(name, version):
+    from .models import NotificationChannel
+    return _lookup(NotificationChannel, 'channel', name, version)
+
+
+@lru_cache(maxsize=128)
+def _get_category(name, version):
+    from .models import NotificationCategory
+    return _lookup(NotificationCategory, 'category', name, version)
+
+
+def get_channel(name):
+    """Return the NotificationChannel called ``name``, or None."""
+    return _get_channel(name, _version())
+
+
+def get_category(name):
+    """Return the NotificationCategory called ``name``, or None."""
+    return _get_category(name, _version())
@@ -1,12 +1,56 @@
-from django.db import models
+from django.db import models, transaction
+from django.contrib.postgres.indexes import GinIndex
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from django.core.validators import URLValidator
+from django_redis import get_redis_connection
+import os
 import uuid
 
+import orjson
+import zstandard
+
+from . import batch, lookups, pref_cache
+
 
 User = get_user_model()
 
+EPHEMERAL_CHANNEL = 'notif:user:{user_id}'
+
+UNREAD_COUNT_CACHE_KEY = 'notif:unread:{user_id}'
+UNREAD_COUNT_CACHE_TTL = 60  # seconds
+
+ZSTD_LEVEL = 3
+
+
+def random_uuids(count):
+    """Generate ``count`` version 4 UUIDs from a single os.urandom() call."""
+    raw = os.urandom(16 * count)
+    return [uuid.UUID(bytes=raw[i:i + 16], version=4) for i in range(0, 16 * count, 16)]
+
+
+def clear_unread_count_cache(*user_ids):
+    """Drop the cached unread notification counts for the given users."""
+    cache.delete_many([UNREAD_COUNT_CACHE_KEY.format(user_id=user_id) for user_id in user_ids])
+
+
+def encode_json(value):
+    """Encode ``value`` as JSON text, accepting the non-string keys JSONField does."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def compress_text(value):
+    """Compress ``value`` with zstd for a BinaryField; empty text stays empty."""
+    return zstandard.compress(value.encode(), level=ZSTD_LEVEL) if value else b''
+
+
+def decompress_text(data):
+    """Inverse of compress_text()."""
+    return zstandard.decompress(data).decode() if data else ''
+
 
 class NotificationChannel(models.Model):
     """
@@ -58,22 +102,126 @@ class NotificationCategory(models.Model):
         return self.name
 
 
+# Time-independent part of Notification.should_deliver(), shared by the
+# notif_deliverable partial index and NotificationManager.deliverable()
+DELIVERABLE_Q = models.Q(
+    is_archived=False, is_dismissed=False, status__in=['pending', 'scheduled']
+)
+
+
 class NotificationManager(models.Manager):
     """Custom manager for Notification model."""
     
+    def deliverable(self, now=None):
+        """
+        Get scheduled notifications that are due and should be delivered.
+        
+        SQL counterpart of Notification.should_deliver(), served by the
+        notif_deliverable partial index.
+        """
+        now = now or timezone.now()
+        return self.filter(DELIVERABLE_Q, scheduled_at__lte=now).filter(
+            models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=now)
+        )
+    
+    def with_related(self):
+        """
+        Load the related rows a notification listing touches in one pass.
+        
+        Foreign keys and the per-channel delivery records are joined; active
+        channels are prefetched into ``active_channels``.
+        """
+        return self.select_related(
+            'user', 'sender', 'category',
+            'email_notification', 'push_notification', 'webhook_notification'
+        ).prefetch_related(
+            models.Prefetch(
+                'channels',
+                queryset=NotificationChannel.objects.filter(is_active=True),
+                to_attr='active_channels'
+            )
+        )
+    
     def unread(self, user):
         """Get unread notifications for a user."""
-        return self.filter(user=user, is_read=False)
+        return self.with_related().filter(user=user, is_read=False)
     
     def unread_count(self, user):
-        """Get count of unread notifications for a user."""
-        return self.unread(user).count()
+        """
+        Get count of unread notifications for a user.
+        
+        The count is cached for UNREAD_COUNT_CACHE_TTL seconds and dropped
+        whenever one of the user's notifications is saved or deleted.
+        """
+        key = UNREAD_COUNT_CACHE_KEY.format(user_id=getattr(user, 'pk', user))
+        count = cache.get(key)
+        if count is None:
+            count = self.unread(user).count()
+            cache.set(key, count, UNREAD_COUNT_CACHE_TTL)
+        return count
     
     def mark_all_as_read(self, user):
-        """Mark all notifications as read for a user."""
-        return self.filter(user=user, is_read=False).update(
-            is_read=True, read_at=timezone.now()
+        """
+        Mark all notifications as read for a user.
+        
+        The user has no unread notifications afterwards, so the cached
+        count is set to zero rather than cleared, saving the recount.
+        """
+        updated = self.filter(user=user, is_read=False).update(
+            is_read=True, read_at=timezone.now(), status='read'
         )
+        key = UNREAD_COUNT_CACHE_KEY.format(user_id=getattr(user, 'pk', user))
+        cache.set(key, 0, UNREAD_COUNT_CACHE_TTL)
+        return updated
+    
+    def send_ephemeral(self, user, **fields):
+        """
+        Push a short-lived notification straight to a user's live connections.
+        
+        Nothing is written to the database: the payload is published on the
+        user's EPHEMERAL_CHANNEL for the WebSocket layer to forward, so use
+        this only for toasts that need not survive a missed connection.
+        Returns the number of subscribers that received it.
+        """
+        user_id = getattr(user, 'pk', user)
+        payload = {
+            'id': uuid.uuid4(),
+            'ephemeral': True,
+            'created_at': timezone.now(),
+            **fields,
+        }
+        conn = get_redis_connection('default')
+        return conn.publish(
+            EPHEMERAL_CHANNEL.format(user_id=user_id), orjson.dumps(payload)
+        )
+    
+    def bulk_send(self, user_ids, *, title, message, category, channels=(), **fields):
+        """
+        Create the same notification for many users at once.
+        
+        Rows are inserted with bulk_create and the channel links with a single
+        bulk insert into the through table, instead of a save() and
+        channels.add() per recipient. Returns the created notifications.
+        """
+        emails = dict(User.objects.filter(pk__in=user_ids).values_list('pk', 'email'))
+        notifications = [
+            self.model(
+                id=pk, user_id=user_id, user_email=email, title=title, message=message,
+                category=category, **fields
+            )
+            for pk, (user_id, email) in zip(random_uuids(len(emails)), emails.items())
+        ]
+        through = self.model.channels.through
+        with transaction.atomic():
+            self.bulk_create(notifications, batch_size=1000)
+            through.objects.bulk_create([
+                through(notification_id=notification.pk, notificationchannel_id=channel.pk)
+                for notification in notifications
+                for channel in channels
+            ], batch_size=1000, ignore_conflicts=True)
+        # bulk_create sends no post_save, so drop the cached counts here
+        clear_unread_count_cache(*emails)
+        return notifications
 
 
 class Notification(models.Model):
@@ -90,6 +238,7 @@ class Notification(models.Model):
     
     STATUS_CHOICES = [
         ('pending', 'Pending'),
+        ('scheduled', 'Scheduled'),
         ('sent', 'Sent'),
         ('delivered', 'Delivered'),
         ('failed', 'Failed'),
@@ -99,6 +248,7 @@ class Notification(models.Model):
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    user_email = models.EmailField(blank=True, editable=False)  # Snapshot of user.email at creation
     sender = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='sent_notifications')
     
     # Content
@@ -141,15 +291,38 @@ class Notification(models.Model):
     class Meta:
         db_table = 'notifications'
         indexes = [
-            models.Index(fields=['user']),
-            models.Index(fields=['user', 'is_read']),
+            # Only unread rows are indexed; serves unread() and unread_count()
+            models.Index(
+                fields=['user', 'created_at'], name='notif_unread_by_user',
+                condition=models.Q(is_read=False)
+            ),
+            # Serves the per-user notification list, newest first
+            models.Index(fields=['user', '-created_at'], name='notif_list_by_user'),
+            # Serves NotificationManager.deliverable(); expiry is checked at query
+            # time because index predicates cannot reference now()
+            models.Index(fields=['scheduled_at'], name='notif_deliverable', condition=DELIVERABLE_Q),
+            # Serves should_deliver() scans over undelivered notifications
+            models.Index(
+                fields=['user', 'status', 'created_at'], name='notif_pending_by_user',
+                condition=models.Q(status__in=['pending', 'scheduled'])
+            ),
             models.Index(fields=['user', 'status']),
-            models.Index(fields=['category']),
-            models.Index(fields=['priority']),
+            # Only the rare high-priority values are selective enough to index
+            models.Index(
+                fields=['priority', 'created_at'], name='notif_high_priority',
+                condition=models.Q(priority__in=['high', 'urgent'])
+            ),
             models.Index(fields=['created_at']),
             models.Index(fields=['scheduled_at']),
             models.Index(fields=['expires_at']),
-            models.Index(fields=['user', 'created_at']),
+            # Composite and partial indexes for the admin changelist filters
+            models.Index(fields=['status', 'scheduled_at']),
+            models.Index(
+                fields=['status', '-created_at'], name='notif_unarchived_idx',
+                condition=models.Q(is_archived=False)
+            ),
+            # Containment lookups on extra_data (jsonb), e.g. extra_data__contains
+            GinIndex(fields=['extra_data'], name='notif_extradata_gin'),
         ]
         ordering = ['-created_at']
         permissions = [
@@ -159,46 +332,69 @@ class Notification(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.title} - {self.user.email}"
+        return f"{self.title} - {self.user_email}"
+    
+    def save(self, *args, **kwargs):
+        """Override save to snapshot the recipient's email."""
+        if not self.user_email:
+            self.user_email = self.user.email
+        super().save(*args, **kwargs)
     
-    def mark_as_read(self):
-        """Mark notification as read."""
-        if not self.is_read:
-            self.is_read = True
-            self.read_at = timezone.now()
-            self.status = 'read'
-            self.save(update_fields=['is_read', 'read_at', 'status'])
+    def mark_as_read(self, now=None):
+        """
+        Mark notification as read.
+        
+        Issues a single guarded UPDATE, so concurrent calls only mark the row
+        once. No post_save is sent, so the unread count cache is cleared here.
+        """
+        if self.is_read:
+            return
+        now = now or timezone.now()
+        updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+            is_read=True, read_at=now, status='read'
+        )
+        if updated:
+            self.is_read, self.read_at, self.status = True, now, 'read'
+            clear_unread_count_cache(self.user_id)
     
-    def mark_as_clicked(self):
+    def mark_as_clicked(self, now=None):
         """Mark notification as clicked."""
-        if not self.is_clicked:
-            self.is_clicked = True
-            self.clicked_at = timezone.now()
-            self.save(update_fields=['is_clicked', 'clicked_at'])
+        if self.is_clicked:
+            return
+        now = now or timezone.now()
+        if Notification.objects.filter(pk=self.pk, is_clicked=False).update(
+            is_clicked=True, clicked_at=now
+        ):
+            self.is_clicked, self.clicked_at = True, now
     
     def archive(self):
         """Archive the notification."""
-        self.is_archived = True
-        self.status = 'archived'
-        self.save(update_fields=['is_archived', 'status'])
+        Notification.objects.filter(pk=self.pk).update(is_archived=True, status='archived')
+        self.is_archived, self.status = True, 'archived'
     
-    def dismiss(self):
+    def dismiss(self, now=None):
         """Dismiss the notification."""
-        self.is_dismissed = True
-        self.dismissed_at = timezone.now()
-        self.save(update_fields=['is_dismissed', 'dismissed_at'])
-    
-    def mark_as_sent(self):
+        if self.is_dismissed:
+            return
+        now = now or timezone.now()
+        if Notification.objects.filter(pk=self.pk, is_dismissed=False).update(
+            is_dismissed=True, dismissed_at=now
+        ):
+            self.is_dismissed, self.dismissed_at = True, now
+    
+    def mark_as_sent(self, now=None):
         """Mark notification as sent."""
         self.status = 'sent'
-        self.sent_at = timezone.now()
-        self.save(update_fields=['status', 'sent_at'])
+        now = now or timezone.now()
+        self.sent_at = now
+        batch.enqueue(self, ['status', 'sent_at'])
     
-    def mark_as_delivered(self):
+    def mark_as_delivered(self, now=None):
         """Mark notification as delivered."""
         self.status = 'delivered'
-        self.delivered_at = timezone.now()
-        self.save(update_fields=['status', 'delivered_at'])
+        now = now or timezone.now()
+        self.delivered_at = now
+        batch.enqueue(self, ['status', 'delivered_at'])
     
     def is_expired(self):
         """Check if notification has expired."""
@@ -221,6 +417,50 @@ class Notification(models.Model):
         return None
 
 
+def in_quiet_hours(start, end, now_time):
+    """Check if ``now_time`` falls in the quiet window from ``start`` to ``end``."""
+    if start <= end:
+        return start <= now_time <= end
+    # Quiet hours cross midnight
+    return now_time >= start or now_time <= end
+
+
+def quiet_hours_q(now_time):
+    """
+    Q matching preferences whose quiet hours include ``now_time``.
+    
+    SQL counterpart of NotificationPreference.is_quiet_time(), including
+    windows that cross midnight.
+    """
+    same_day = models.Q(quiet_hours_start__lte=models.F('quiet_hours_end')) & models.Q(
+        quiet_hours_start__lte=now_time, quiet_hours_end__gte=now_time
+    )
+    cross_midnight = models.Q(quiet_hours_start__gt=models.F('quiet_hours_end')) & (
+        models.Q(quiet_hours_start__lte=now_time) | models.Q(quiet_hours_end__gte=now_time)
+    )
+    return models.Q(
+        quiet_hours_enabled=True,
+        quiet_hours_start__isnull=False,
+        quiet_hours_end__isnull=False,
+    ) & (same_day | cross_midnight)
+
+
+class NotificationPreferenceManager(models.Manager):
+    """Custom manager for NotificationPreference model."""
+    
+    def deliverable_now(self):
+        """
+        Get preferences that would accept a notification right now.
+        
+        Same rules as NotificationPreference.should_receive_notification(),
+        evaluated in one query so bulk sends can filter recipients up front.
+        """
+        now = timezone.now()
+        return self.filter(is_enabled=True).exclude(
+            do_not_disturb_until__gt=now
+        ).exclude(quiet_hours_q(timezone.localtime(now).time()))
+
+
 class NotificationPreference(models.Model):
     """
     User preferences for different types of notifications and channels.
@@ -255,6 +495,8 @@ class NotificationPreference(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = NotificationPreferenceManager()
+    
     class Meta:
         db_table = 'notification_preferences'
         unique_together = ('user', 'category')
@@ -269,13 +511,7 @@ class NotificationPreference(models.Model):
             return False
         
         now = timezone.localtime(timezone.now()).time()
-        start = self.quiet_hours_start
-        end = self.quiet_hours_end
-        
-        if start <= end:
-            return start <= now <= end
-        else:  # Quiet hours cross midnight
-            return now >= start or now <= end
+        return in_quiet_hours(self.quiet_hours_start, self.quiet_hours_end, now)
     
     def should_receive_notification(self):
         """Check if user should receive notifications for this category."""
@@ -310,7 +546,7 @@ class EmailNotification(models.Model):
     to_email = models.EmailField()
     from_email = models.EmailField(default='noreply@messagingapp.com')
     subject = models.CharField(max_length=255)
-    html_content = models.TextField()
+    html_content_zstd = models.BinaryField()  # html_content, zstd-compressed
     text_content = models.TextField()
     
     # Email tracking
@@ -336,24 +572,36 @@ class EmailNotification(models.Model):
     def __str__(self):
         return f"Email: {self.subject} to {self.to_email}"
     
-    def mark_as_opened(self):
+    @property
+    def html_content(self):
+        """HTML body, decompressed on access."""
+        return decompress_text(self.html_content_zstd)
+    
+    @html_content.setter
+    def html_content(self, value):
+        self.html_content_zstd = compress_text(value)
+    
+    def mark_as_opened(self, now=None):
         """Mark email as opened."""
-        self.opened_at = timezone.now()
+        now = now or timezone.now()
+        self.opened_at = now
         self.status = 'opened'
-        self.save(update_fields=['opened_at', 'status'])
+        batch.enqueue(self, ['opened_at', 'status'])
     
-    def mark_as_clicked(self):
+    def mark_as_clicked(self, now=None):
         """Mark email as clicked."""
-        self.clicked_at = timezone.now()
+        now = now or timezone.now()
+        self.clicked_at = now
         self.status = 'clicked'
-        self.save(update_fields=['clicked_at', 'status'])
+        batch.enqueue(self, ['clicked_at', 'status'])
     
-    def mark_as_bounced(self, bounce_type='unknown'):
+    def mark_as_bounced(self, bounce_type='unknown', now=None):
         """Mark email as bounced."""
-        self.bounced_at = timezone.now()
+        now = now or timezone.now()
+        self.bounced_at = now
         self.bounce_type = bounce_type
         self.status = 'bounced'
-        self.save(update_fields=['bounced_at', 'bounce_type', 'status'])
+        batch.enqueue(self, ['bounced_at', 'bounce_type', 'status'])
 
 
 class PushNotification(models.Model):
@@ -384,6 +632,7 @@ class PushNotification(models.Model):
     
     # Data payload (additional data for the app)
     data = models.JSONField(default=dict, blank=True)
+    payload_json = models.TextField(blank=True, editable=False)  # data, pre-encoded for dispatch
     
     # Tracking
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -405,24 +654,44 @@ class PushNotification(models.Model):
     def __str__(self):
         return f"Push: {self.title} to {self.platform}"
     
-    def mark_as_sent(self):
+    def save(self, *args, **kwargs):
+        """Override save to pre-encode the data payload for dispatch."""
+        self.payload_json = encode_json(self.data)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'data' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'payload_json'}
+        super().save(*args, **kwargs)
+    
+    def get_payload_json(self):
+        """
+        Return the data payload as JSON text.
+        
+        Rows written without save() (bulk_create, update(), older rows) have
+        no pre-encoded copy, so the payload is encoded here instead.
+        """
+        return self.payload_json or encode_json(self.data)
+    
+    def mark_as_sent(self, now=None):
         """Mark push notification as sent."""
         self.status = 'sent'
-        self.sent_at = timezone.now()
-        self.save(update_fields=['status', 'sent_at'])
+        now = now or timezone.now()
+        self.sent_at = now
+        batch.enqueue(self, ['status', 'sent_at'])
     
-    def mark_as_clicked(self):
+    def mark_as_clicked(self, now=None):
         """Mark push notification as clicked."""
         self.status = 'clicked'
-        self.clicked_at = timezone.now()
-        self.save(update_fields=['status', 'clicked_at'])
+        now = now or timezone.now()
+        self.clicked_at = now
+        batch.enqueue(self, ['status', 'clicked_at'])
     
-    def mark_as_failed(self, error_message=''):
+    def mark_as_failed(self, error_message='', now=None):
         """Mark push notification as failed."""
         self.status = 'failed'
-        self.failed_at = timezone.now()
+        now = now or timezone.now()
+        self.failed_at = now
         self.error_message = error_message
-        self.save(update_fields=['status', 'failed_at', 'error_message'])
+        batch.enqueue(self, ['status', 'failed_at', 'error_message'])
 
 
 class WebhookNotification(models.Model):
@@ -446,10 +715,11 @@ class WebhookNotification(models.Model):
     
     # Payload
     payload = models.JSONField(default=dict)
+    payload_json = models.TextField(blank=True, editable=False)  # payload, pre-encoded for dispatch
     
     # Response tracking
     status_code = models.PositiveIntegerField(null=True, blank=True)
-    response_body = models.TextField(blank=True)
+    response_body_zstd = models.BinaryField(blank=True, default=b'')  # response_body, zstd-compressed
     response_headers = models.JSONField(default=dict, blank=True)
     
     # Status and retry
@@ -468,39 +738,111 @@ class WebhookNotification(models.Model):
     class Meta:
         db_table = 'webhook_notifications'
         ordering = ['-created_at']
+        indexes = [
+            # Serves the retry sweep in notifications.tasks.requeue_due_webhooks
+            models.Index(
+                fields=['next_retry_at', 'status'], name='webhook_retry_due_idx',
+                condition=models.Q(status__in=['failed', 'retried'])
+            ),
+            # Serves the stale-claim reclaim in the same sweep
+            models.Index(
+                fields=['sent_at'], name='webhook_sent_stale_idx',
+                condition=models.Q(status='sent')
+            ),
+        ]
     
     def __str__(self):
         return f"Webhook: {self.method} {self.url}"
     
+    @property
+    def response_body(self):
+        """Response body, decompressed on access."""
+        return decompress_text(self.response_body_zstd)
+    
+    @response_body.setter
+    def response_body(self, value):
+        self.response_body_zstd = compress_text(value)
+    
+    def save(self, *args, **kwargs):
+        """Override save to pre-encode the payload for dispatch."""
+        self.payload_json = encode_json(self.payload)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'payload' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'payload_json'}
+        super().save(*args, **kwargs)
+    
+    def get_payload_json(self):
+        """Return the payload as JSON text, as PushNotification.get_payload_json()."""
+        return self.payload_json or encode_json(self.payload)
+    
     def can_retry(self):
         """Check if webhook can be retried."""
         return self.retry_count < self.max_retries and self.status in ['failed', 'retried']
     
-    def mark_as_delivered(self, status_code, response_body='', response_headers=None):
-        """Mark webhook as successfully delivered."""
+    def mark_as_delivered(self, status_code, response_body='', response_headers=None, now=None,
+                          queue=True):
+        """
+        Mark webhook as successfully delivered.
+        
+        With ``queue=False`` the fields are only set on the instance, for a
+        caller that writes them itself.
+        """
         self.status = 'delivered'
         self.status_code = status_code
         self.response_body = response_body
         self.response_headers = response_headers or {}
-        self.delivered_at = timezone.now()
-        self.save(update_fields=[
-            'status', 'status_code', 'response_body', 'response_headers', 'delivered_at'
-        ])
-    
-    def mark_as_failed(self, status_code=None, response_body=''):
-        """Mark webhook as failed."""
+        now = now or timezone.now()
+        self.delivered_at = now
+        if queue:
+            batch.enqueue(self, [
+                'status', 'status_code', 'response_body_zstd', 'response_headers', 'delivered_at'
+            ])
+    
+    def mark_as_failed(self, status_code=None, response_body='', now=None, queue=True):
+        """Mark webhook as failed. ``queue`` is as for mark_as_delivered()."""
         self.status = 'failed' if not self.can_retry() else 'retried'
         self.status_code = status_code
         self.response_body = response_body
-        self.failed_at = timezone.now()
+        now = now or timezone.now()
+        self.failed_at = now
         
         if self.can_retry():
             self.retry_count += 1
             # Schedule retry in 5 minutes
             from datetime import timedelta
-            self.next_retry_at = timezone.now() + timedelta(minutes=5)
+            self.next_retry_at = now + timedelta(minutes=5)
         
-        self.save(update_fields=[
-            'status', 'status_code', 'response_body', 'failed_at', 
-            'retry_count', 'next_retry_at'
-        ])
\ No newline at end of file
+        if queue:
+            batch.enqueue(self, [
+                'status', 'status_code', 'response_body_zstd', 'failed_at', 
+                'retry_count', 'next_retry_at'
+            ])
+
+
+@receiver(post_save, sender=Notification)
+def invalidate_unread_count_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """Drop the cached unread count when a notification's read state may have changed."""
+    if created or update_fields is None or 'is_read' in update_fields:
+        clear_unread_count_cache(instance.user_id)
+
+
+@receiver(post_delete, sender=Notification)
+def invalidate_unread_count_on_delete(sender, instance, **kwargs):
+    """Drop the cached unread count when a notification is deleted."""
+    clear_unread_count_cache(instance.user_id)
+
+
+@receiver(post_save, sender=NotificationChannel)
+@receiver(post_delete, sender=NotificationChannel)
+@receiver(post_save, sender=NotificationCategory)
+@receiver(post_delete, sender=NotificationCategory)
+def invalidate_lookups(sender, **kwargs):
+    """Retire cached channel and category lookups after a change."""
+    lookups.bump_lookup_version()
+
+
+@receiver(post_save, sender=NotificationPreference)
+@receiver(post_delete, sender=NotificationPreference)
+def invalidate_cached_prefs(sender, instance, **kwargs):
+    """Drop the user's cached preferences after a change."""
+    pref_cache.clear_prefs(instance.user_id)
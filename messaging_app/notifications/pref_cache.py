@@ -0,0 +1,84 @@
+"""
+Cached notification preferences for send-time checks.
+
+Deciding whether a user should receive a notification needs their
+preference row for the notification's category. During a broadcast that is
+one query per recipient, so each user's preferences are kept in the cache
+as one dict keyed by category, loaded in a single query on a miss and
+dropped whenever a preference is saved or deleted.
+"""
+
+from django.core.cache import cache
+from django.utils import timezone
+
+
+PREFS_KEY = 'prefs:{user_id}'
+PREFS_TTL = 3600  # seconds
+
+
+def _as_dict(pref):
+    return {
+        'is_enabled': pref.is_enabled,
+        'email': pref.email_enabled,
+        'push': pref.push_enabled,
+        'sms': pref.sms_enabled,
+        'frequency': pref.frequency,
+        'quiet_hours_enabled': pref.quiet_hours_enabled,
+        'quiet_start': pref.quiet_hours_start,
+        'quiet_end': pref.quiet_hours_end,
+        'dnd_until': pref.do_not_disturb_until,
+    }
+
+
+def get_prefs(user_id):
+    """
+    Return a user's notification preferences keyed by category id.
+
+    Each value is a dict with ``is_enabled``, ``email``, ``push``, ``sms``,
+    ``frequency``, ``quiet_hours_enabled``, ``quiet_start``, ``quiet_end``
+    and ``dnd_until``.
+    """
+    from .models import NotificationPreference
+
+    key = PREFS_KEY.format(user_id=user_id)
+    prefs = cache.get(key)
+    if prefs is None:
+        # Users without any preferences are cached too, as an empty dict
+        prefs = {
+            pref.category_id: _as_dict(pref)
+            for pref in NotificationPreference.objects.filter(user_id=user_id)
+        }
+        cache.set(key, prefs, PREFS_TTL)
+    return prefs
+
+
+def clear_prefs(user_id):
+    """Drop a user's cached preferences."""
+    cache.delete(PREFS_KEY.format(user_id=user_id))
+
+
+def should_receive(user_id, category_id, now=None):
+    """
+    Check if a user should receive a notification in a category right now.
+
+    Cached counterpart of NotificationPreference.should_receive_notification().
+    Users with no preference for the category receive notifications.
+    """
+    from .models import in_quiet_hours
+
+    prefs = get_prefs(user_id).get(category_id)
+    if prefs is None:
+        return True
+
+    if not prefs['is_enabled']:
+        return False
+
+    now = now or timezone.now()
+    if prefs['dnd_until'] and now < prefs['dnd_until']:
+        return False
+
+    if prefs['quiet_hours_enabled'] and prefs['quiet_start'] and prefs['quiet_end']:
+        if in_quiet_hours(prefs['quiet_start'], prefs['quiet_end'], timezone.localtime(now).time()):
+            return False
+
+    return True
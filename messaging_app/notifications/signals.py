@@ -0,0 +1,11 @@
+"""
+Signals for the notifications app.
+"""
+
+from django.dispatch import Signal
+
+
+# Sent once after a bulk mark-as-read instead of a save signal per row.
+# Receivers get ``queryset`` (the selected notifications) and ``request``
+# and should process the selection in bulk.
+notifications_bulk_marked_read = Signal()
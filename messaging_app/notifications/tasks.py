@@ -0,0 +1,95 @@
+"""
+Background tasks for the notifications app.
+"""
+
+from datetime import timedelta
+
+from celery import shared_task
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import async_dispatch, batch
+from .models import WebhookNotification
+
+
+RETRY_SWEEP_CHUNK_SIZE = 500
+
+WEBHOOK_DISPATCH_BATCH_SIZE = 500
+
+# Webhooks still 'sent' after this long were claimed by a dispatch run that
+# died before recording an outcome
+STALE_SENT_TIMEOUT = timedelta(minutes=10)
+
+
+@shared_task(ignore_result=True)
+def flush_status_updates():
+    """Flush coalesced delivery status updates to the database."""
+    return batch.flush_status_updates()
+
+
+@shared_task(ignore_result=True)
+def requeue_due_webhooks():
+    """
+    Move failed webhooks whose retry time has passed back to pending.
+    
+    Webhooks stuck in sent past STALE_SENT_TIMEOUT were claimed by a
+    dispatch run that died before recording an outcome. Each reclaim counts
+    as an attempt: the row goes back to pending, or to failed once
+    max_retries is used up, so a webhook that keeps crashing the dispatcher
+    cannot loop forever.
+    
+    Due rows are streamed by primary key and updated a chunk at a time, so
+    the sweep's memory and lock footprint stay bounded however large the
+    backlog is.
+    """
+    # Same predicate as WebhookNotification.can_retry()
+    retryable = WebhookNotification.objects.filter(
+        status__in=['failed', 'retried'], retry_count__lt=F('max_retries')
+    )
+    now = timezone.now()
+    due = retryable.filter(next_retry_at__lte=now).values_list('pk', flat=True)
+    
+    requeued = 0
+    for chunk in batch.chunked(due.iterator(chunk_size=RETRY_SWEEP_CHUNK_SIZE), RETRY_SWEEP_CHUNK_SIZE):
+        requeued += retryable.filter(pk__in=chunk).update(status='pending', next_retry_at=None)
+    
+    stale = WebhookNotification.objects.filter(status='sent', sent_at__lt=now - STALE_SENT_TIMEOUT)
+    stale_pks = stale.values_list('pk', flat=True)
+    for chunk in batch.chunked(stale_pks.iterator(chunk_size=RETRY_SWEEP_CHUNK_SIZE), RETRY_SWEEP_CHUNK_SIZE):
+        stale.filter(pk__in=chunk, retry_count__gte=F('max_retries') - 1).update(
+            status='failed', failed_at=now, retry_count=F('retry_count') + 1
+        )
+        requeued += stale.filter(pk__in=chunk).update(
+            status='pending', retry_count=F('retry_count') + 1
+        )
+    return requeued
+
+
+@shared_task(ignore_result=True)
+def dispatch_pending_webhooks():
+    """
+    Send a batch of pending webhooks concurrently.
+    
+    Rows are claimed with SKIP LOCKED and moved to sent before any request
+    goes out, so overlapping runs never deliver the same webhook twice.
+    """
+    with transaction.atomic():
+        webhooks = list(
+            WebhookNotification.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .only('id', 'url', 'method', 'headers', 'payload_json', 'status',
+                  'response_headers', 'delivered_at', 'failed_at', 'retry_count',
+                  'max_retries', 'next_retry_at')
+            .order_by('created_at')[:WEBHOOK_DISPATCH_BATCH_SIZE]
+        )
+        now = timezone.now()
+        WebhookNotification.objects.filter(pk__in=[wh.pk for wh in webhooks]).update(
+            status='sent', sent_at=now
+        )
+    
+    for webhook in webhooks:
+        webhook.status = 'sent'
+        webhook.sent_at = now
+    return async_dispatch.deliver_webhooks(webhooks)
@@ -0,0 +1,272 @@
+"""
+Test suite for the notifications app.
+
+Tests cover the coalesced status writes in notifications.batch (queued
+transitions reaching the database, surviving a failed flush, and not
+overwriting a status the row has already moved past) and the webhook
+dispatch and retry tasks, and the cached preference lookups.
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+import httpx
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django_redis import get_redis_connection
+from . import async_dispatch, batch, pref_cache, tasks
+from .models import (
+    Notification, NotificationCategory, NotificationPreference, WebhookNotification
+)
+
+
+User = get_user_model()
+
+
+class StatusUpdateBatchTest(TestCase):
+    """Test cases for the enqueue -> flush round trip."""
+
+    def setUp(self):
+        """Set up test data and empty the status update queues."""
+        self.conn = get_redis_connection('default')
+        self.conn.delete(batch.PENDING_STATUS_UPDATES_KEY, batch.PROCESSING_STATUS_UPDATES_KEY)
+        self.addCleanup(
+            self.conn.delete,
+            batch.PENDING_STATUS_UPDATES_KEY, batch.PROCESSING_STATUS_UPDATES_KEY
+        )
+
+        self.user = User.objects.create_user(
+            username='recipient',
+            email='recipient@example.com',
+            password='testpassword123',
+            first_name='Test',
+            last_name='Recipient'
+        )
+        self.category = NotificationCategory.objects.create(name='System')
+        self.notification = Notification.objects.create(
+            user=self.user,
+            category=self.category,
+            title='Welcome',
+            message='Hello there'
+        )
+
+    def flush(self):
+        """Flush pending updates, running the post-commit cleanup."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return batch.flush_status_updates()
+
+    def test_flush_applies_queued_fields(self):
+        """Test that queued field values are written on flush."""
+        self.notification.mark_as_sent()
+        self.notification.mark_as_delivered()
+
+        # Nothing is written until the flush
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, 'pending')
+
+        self.assertEqual(self.flush(), 1)
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, 'delivered')
+        self.assertIsNotNone(self.notification.sent_at)
+        self.assertIsNotNone(self.notification.delivered_at)
+        self.assertFalse(self.conn.exists(batch.PENDING_STATUS_UPDATES_KEY))
+        self.assertFalse(self.conn.exists(batch.PROCESSING_STATUS_UPDATES_KEY))
+
+    def test_failed_flush_keeps_updates(self):
+        """Test that updates survive a flush whose database write fails."""
+        self.notification.mark_as_delivered()
+
+        with mock.patch.object(Notification.objects, 'bulk_update', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.flush()
+
+        self.assertEqual(self.flush(), 1)
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, 'delivered')
+
+    def test_flush_does_not_move_status_backwards(self):
+        """Test that a queued delivery does not overwrite a later read."""
+        self.notification.mark_as_delivered()
+        Notification.objects.get(pk=self.notification.pk).mark_as_read()
+
+        self.flush()
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, 'read')
+        self.assertTrue(self.notification.is_read)
+        self.assertIsNotNone(self.notification.delivered_at)
+
+    def test_unknown_status_does_not_block_flush(self):
+        """Test that a row whose status is outside the choices still flushes."""
+        Notification.objects.filter(pk=self.notification.pk).update(status='legacy')
+        self.notification.mark_as_sent()
+
+        self.assertEqual(self.flush(), 1)
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, 'sent')
+        self.assertFalse(self.conn.exists(batch.PROCESSING_STATUS_UPDATES_KEY))
+
+    def test_scheduled_notification_is_sent(self):
+        """Test that a queued send moves a scheduled notification forward."""
+        Notification.objects.filter(pk=self.notification.pk).update(status='scheduled')
+        self.notification.mark_as_sent()
+
+        self.flush()
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, 'sent')
+
+
+class WebhookTaskTest(TestCase):
+    """Test cases for webhook dispatch and the retry sweep."""
+
+    def setUp(self):
+        """Set up a recipient to attach webhooks to."""
+        self.user = User.objects.create_user(
+            username='integrator',
+            email='integrator@example.com',
+            password='testpassword123'
+        )
+        self.category = NotificationCategory.objects.create(name='Integrations')
+
+    def create_webhook(self, url='https://hooks.example.com/ok', **kwargs):
+        """Create a webhook with its own notification."""
+        notification = Notification.objects.create(
+            user=self.user, category=self.category, title='Event', message='Happened'
+        )
+        return WebhookNotification.objects.create(
+            notification=notification, url=url, payload={'event': 'created'}, **kwargs
+        )
+
+    async def fake_send(self, webhooks, *args):
+        """Answer by URL: ok -> 200, error -> 500, anything else fails to connect."""
+        outcomes = []
+        for webhook in webhooks:
+            if webhook.url.endswith('/ok'):
+                outcomes.append(httpx.Response(200, text='accepted'))
+            elif webhook.url.endswith('/error'):
+                outcomes.append(httpx.Response(500, text='broken'))
+            else:
+                outcomes.append(httpx.ConnectError('refused'))
+        return outcomes
+
+    def test_dispatch_records_outcomes(self):
+        """Test that dispatch writes each outcome without going through the flush."""
+        ok = self.create_webhook()
+        error = self.create_webhook('https://hooks.example.com/error')
+        down = self.create_webhook('https://down.example.com/hook')
+
+        with mock.patch.object(async_dispatch, 'send_webhooks', self.fake_send), \
+                mock.patch.object(batch, 'enqueue') as enqueue:
+            self.assertEqual(tasks.dispatch_pending_webhooks(), 1)
+        enqueue.assert_not_called()
+
+        ok.refresh_from_db()
+        self.assertEqual(ok.status, 'delivered')
+        self.assertEqual(ok.status_code, 200)
+        self.assertEqual(ok.response_body, 'accepted')
+        self.assertIsNotNone(ok.sent_at)
+
+        error.refresh_from_db()
+        self.assertEqual(error.status, 'failed')
+        self.assertEqual(error.status_code, 500)
+
+        down.refresh_from_db()
+        self.assertEqual(down.status, 'failed')
+        self.assertIsNone(down.status_code)
+        self.assertEqual(down.response_body, 'refused')
+
+    def test_dispatch_encodes_missing_payload_json(self):
+        """Test that webhooks written without save() are sent with their payload."""
+        webhook = self.create_webhook()
+        WebhookNotification.objects.filter(pk=webhook.pk).update(payload={1: 'a'}, payload_json='')
+
+        with mock.patch.object(async_dispatch, 'send_webhooks', side_effect=self.fake_send) as send:
+            tasks.dispatch_pending_webhooks()
+        self.assertEqual(send.call_args.args[1], ['{"1":"a"}'])
+
+    def test_save_accepts_non_string_keys(self):
+        """Test that payloads JSONField accepts can also be pre-encoded."""
+        webhook = self.create_webhook()
+        webhook.payload = {1: 'a'}
+        webhook.save()
+        self.assertEqual(webhook.payload_json, '{"1":"a"}')
+
+    def test_dispatch_skips_claimed_webhooks(self):
+        """Test that only pending webhooks are dispatched."""
+        self.create_webhook(status='sent', sent_at=timezone.now())
+
+        with mock.patch.object(async_dispatch, 'send_webhooks', self.fake_send):
+            self.assertEqual(tasks.dispatch_pending_webhooks(), 0)
+
+    def test_requeue_due_retries(self):
+        """Test that failed webhooks are requeued once their retry is due."""
+        now = timezone.now()
+        due = self.create_webhook(
+            status='retried', retry_count=1, next_retry_at=now - timedelta(minutes=1)
+        )
+        later = self.create_webhook(
+            status='retried', retry_count=1, next_retry_at=now + timedelta(minutes=5)
+        )
+        exhausted = self.create_webhook(
+            status='failed', retry_count=3, max_retries=3, next_retry_at=now - timedelta(minutes=1)
+        )
+
+        self.assertEqual(tasks.requeue_due_webhooks(), 1)
+        statuses = dict(WebhookNotification.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[due.pk], 'pending')
+        self.assertEqual(statuses[later.pk], 'retried')
+        self.assertEqual(statuses[exhausted.pk], 'failed')
+
+    def test_requeue_reclaims_stale_sent(self):
+        """Test that stranded sent webhooks are reclaimed as a retry attempt."""
+        stale_at = timezone.now() - tasks.STALE_SENT_TIMEOUT - timedelta(minutes=1)
+        stale = self.create_webhook(status='sent', sent_at=stale_at, retry_count=0)
+        last_try = self.create_webhook(
+            status='sent', sent_at=stale_at, retry_count=2, max_retries=3
+        )
+        recent = self.create_webhook(status='sent', sent_at=timezone.now())
+
+        self.assertEqual(tasks.requeue_due_webhooks(), 1)
+
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.retry_count), ('pending', 1))
+        last_try.refresh_from_db()
+        self.assertEqual((last_try.status, last_try.retry_count), ('failed', 3))
+        self.assertIsNotNone(last_try.failed_at)
+        recent.refresh_from_db()
+        self.assertEqual((recent.status, recent.retry_count), ('sent', 0))
+
+
+class PreferenceCacheTest(TestCase):
+    """Test cases for cached notification preferences."""
+
+    def setUp(self):
+        """Set up a user and a category to hold preferences for."""
+        self.user = User.objects.create_user(
+            username='reader',
+            email='reader@example.com',
+            password='testpassword123'
+        )
+        self.category = NotificationCategory.objects.create(name='Digest')
+        pref_cache.clear_prefs(self.user.pk)
+        self.addCleanup(pref_cache.clear_prefs, self.user.pk)
+
+    def test_saving_a_preference_refreshes_the_cache(self):
+        """Test that cached preferences follow saves and deletes."""
+        self.assertTrue(pref_cache.should_receive(self.user.pk, self.category.pk))
+
+        pref = NotificationPreference.objects.create(
+            user=self.user, category=self.category, is_enabled=False
+        )
+        self.assertFalse(pref_cache.should_receive(self.user.pk, self.category.pk))
+
+        pref.delete()
+        self.assertTrue(pref_cache.should_receive(self.user.pk, self.category.pk))
+
+    def test_cached_preferences_skip_the_database(self):
+        """Test that a warm lookup makes no query."""
+        NotificationPreference.objects.create(user=self.user, category=self.category)
+        pref_cache.get_prefs(self.user.pk)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(pref_cache.should_receive(self.user.pk, self.category.pk))